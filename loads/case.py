@@ -47,6 +47,7 @@ class TestCase(unittest.TestCase):
 
         self._ws = []
         self._loads_status = None
+        self._loads_result = None
 
     def defaultTestResult(self):
         return LoadsTestResult()
@@ -75,7 +76,13 @@ class TestCase(unittest.TestCase):
         if (loads_status is not None
                 and result is None
                 and not isinstance(self._test_result, LoadsTestResult)):
-            result = LoadsTestResult(loads_status, self._test_result)
+            # the adapter is reused from one run to the other
+            result = self._loads_result
+            if result is None:
+                result = self._loads_result = LoadsTestResult(
+                    loads_status, self._test_result)
+            else:
+                result.loads_status = loads_status
 
         if loads_status is not None:
             self._loads_status = self.session.loads_status = loads_status
@@ -28,6 +28,17 @@ def _detach_question(runner):
         runner.cancel()
 
 
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError('%r is not a positive integer' %
+                                         value)
+    return number
+
+
 def add_options(items, parser, fmt):
     """Read the list of items and add options to the parser using the given
     format.
@@ -155,6 +166,10 @@ def _parse(sysargs=None):
     group.add_argument('-d', '--duration', help='Duration of the test (s)',
                        type=int, default=None)
 
+    parser.add_argument('--concurrency', type=_positive_int, default=None,
+                        help='Maximum number of users running at the same '
+                             'time. Defaults to all of them.')
+
     parser.add_argument('--version', action='store_true', default=False,
                         help='Displays Loads version and exits.')
 
@@ -186,7 +201,8 @@ def _parse(sysargs=None):
                                 action=option.get('action'))
 
     parser.add_argument('--no-patching',
-                        help='Deactivate Gevent monkey patching.',
+                        help='Deactivate Gevent monkey patching. Blocking '
+                             'calls will then block all the users.',
                         action='store_true', default=False)
 
     parser.add_argument('--project-name', help='Project name.',
@@ -244,6 +260,11 @@ def _parse(sysargs=None):
     parser.add_argument('--no-dns-resolve', help='Do not resolve the domain.',
                         action='store_true', default=False)
 
+    parser.add_argument('--no-collect-tracebacks',
+                        help='Only count the errors and failures, without '
+                             'keeping their tracebacks.',
+                        action='store_true', default=False)
+
     # Adds the per-output and per-runner options.
     add_options(RUNNERS, parser, fmt='--{name}-{option}')
     add_options(output_list(), parser, fmt='--output-{name}-{option}')
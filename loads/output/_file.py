@@ -1,6 +1,16 @@
 from loads.util import DateTimeJSONEncoder
 
 
+class _Encoder(DateTimeJSONEncoder):
+    """Writes the values JSON can't represent, like the exc_info of the
+    local errors, as strings."""
+    def default(self, obj):
+        try:
+            return super(_Encoder, self).default(obj)
+        except TypeError:
+            return str(obj)
+
+
 class FileOutput(object):
     """A output writing to a file."""
     name = 'file'
@@ -10,7 +20,7 @@ class FileOutput(object):
         self.test_result = test_result
         self.current = 0
         self.filename = args['output_file_filename']
-        self.encoder = DateTimeJSONEncoder()
+        self.encoder = _Encoder()
         self.fd = open(self.filename, 'a+')
 
     def push(self, called_method, *args, **data):
@@ -169,15 +169,16 @@ class FunkloadOutput(object):
         test = self._get_test(test, loads_status, agent_id)
         test.failures.append(exc_info[2])
 
-    def startTest(self, test, loads_status=None, agent_id=None):
+    def startTest(self, test, loads_status=None, agent_id=None, when=None):
         hit, user = loads_status[:2]
         key = self._get_key(test, loads_status, agent_id)
         current = self._get_key(None, loads_status, agent_id)
-        t = Test(name=test, hit=hit, user=user)
+        t = Test(start=when or datetime.utcnow(), name=test, hit=hit,
+                 user=user)
         # also record the *current* test for the given loads_status
         self.current_tests[current] = self.tests[key] = t
 
-    def stopTest(self, test, loads_status=None, agent_id=None,
+    def stopTest(self, test, loads_status=None, agent_id=None, when=None,
                  _RESULT=_RESULT):
         """Generates funkload XML items with the data concerning test results.
 
@@ -186,7 +187,7 @@ class FunkloadOutput(object):
         """
         hit, user, current_hit, current_user = loads_status
         t = self._get_test(test, loads_status, agent_id)
-        t.end = datetime.utcnow()
+        t.end = when or datetime.utcnow()
         try:
             requests = t.get_counter('__funkload_requests')
         except KeyError:
@@ -111,11 +111,11 @@ class StdOutput(object):
         # 3 most commons
         errors = defaultdict(int)
 
-        for line in data:
-            if len(line) == 0:
+        for exc_info in data:
+            if len(exc_info) == 0:
                 continue
 
-            exc_class, exc_, tb_ = line[0]
+            exc_class, exc_, tb_ = exc_info
 
             if isinstance(exc_class, basestring):
                 name_ = exc_class
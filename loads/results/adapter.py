@@ -1,21 +1,28 @@
-import functools
+_WRAPPED = frozenset(('startTest', 'stopTest', 'addSuccess', 'addException',
+                      'addError', 'addFailure', 'incr_counter'))
 
 
 class LoadsTestResult(object):
     """Used to make unitest calls compatible with Loads.
 
     This class will add to the API calls the loads_status option Loads uses.
+
+    The wrapped methods read loads_status when they are called, so the same
+    instance can be reused for several runs by updating it.
     """
     def __init__(self, loads_status, result):
         self.result = result
         self.loads_status = loads_status
 
-    def __getattribute__(self, name):
-        klass = super(LoadsTestResult, self)
-        result = klass.__getattribute__('result')
-        attr = getattr(result, name)
-        if name in ('startTest', 'stopTest', 'addSuccess', 'addException',
-                    'addError', 'addFailure', 'incr_counter'):
-            status = klass.__getattribute__('loads_status')
-            return functools.partial(attr, loads_status=status)
+    def _wrap(self, method):
+        def _wrapped(*args, **kw):
+            kw['loads_status'] = self.loads_status
+            return method(*args, **kw)
+        return _wrapped
+
+    def __getattr__(self, name):
+        attr = getattr(self.result, name)
+        if name in _WRAPPED:
+            # keep it for the next lookups
+            attr = self.__dict__[name] = self._wrap(attr)
         return attr
@@ -1,6 +1,19 @@
 import itertools
+import time
+from array import array
+from calendar import timegm
 from collections import defaultdict
 
+try:
+    import gevent
+except ImportError:
+    gevent = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from datetime import datetime, timedelta
 from loads.util import get_quantiles, total_seconds, seconds_to_time, unbatch
 
@@ -20,15 +33,69 @@ class TestResult(object):
 
     def __init__(self, config=None, args=None):
         self.config = config
-        self.hits = []
-        self.tests = {}
+
+        # the tests are stored in a list, and looked up by their integer id.
+        self.tests = []
+        self._test_ids = {}
+
+        # filtered lists of tests, valid as long as no test is added or
+        # finished.
+        self._tests_cache = {}
+        self._tests_cache_state = None
         self.opened_sockets = self.closed_sockets = 0
         self.socket_data_received = 0
         self.start_time = None
         self.stop_time = None
+        # duration of the run, set once it is stopped
+        self._duration = None
         self.observers = []
         self.args = args
 
+        # with --no-collect-tracebacks, only the number of errors and
+        # failures of each test is kept, not their exc_info.
+        self.collect_tracebacks = not (args or {}).get(
+            'no_collect_tracebacks', False)
+
+        # events are sent to the observers by batches, either when
+        # _obs_flush_size events are pending or every _obs_flush_interval
+        # seconds, whichever comes first.
+        self._obs_buffer = []
+        self._obs_flush_size = 256
+        self._obs_flush_interval = .01
+        self._obs_timer = None
+
+        # aggregated counters, maintained as the events come in so that
+        # reading them does not require to walk all the tests and hits.
+        self._nb_finished = 0
+        self._nb_failures = 0
+        self._nb_errors = 0
+        self._nb_success = 0
+
+        # the hits are stored column-wise rather than as a list of Hit
+        # instances: a hit only costs a few bytes in each column, and the
+        # aggregations don't need any attribute lookup. The loads_status
+        # columns use _NONE for the missing values.
+        self._urls = []
+        self._url_ids = {}
+        self._hits_url = array('l')       # indexes in self._urls
+        self._hits_status = array('l')
+        self._hits_elapsed = array('d')   # in seconds
+        self._hits_series = array('l')
+        self._hits_user = array('l')
+        self._hits_current_hit = array('l')
+        self._hits_current_user = array('l')
+        self._hits_method = []
+        self._hits_started = []
+        self._hits_agent_id = []
+
+        # indexes of the hits of each url (by url index) and of each
+        # series, so filtering on them doesn't need to scan all the hits.
+        self._hits_by_url = []
+        self._hits_by_series = {}
+
+        # NumPy copies of the columns, rebuilt when new hits come in.
+        self._hits_arrays = None
+
     def __str__(self):
         duration = seconds_to_time(self.duration)
         msg = 'Ran %d tests in %s. %d hits, %.2f RPS.' % (
@@ -45,7 +112,7 @@ class TestResult(object):
         return msg
 
     def close(self):
-        pass
+        self.flush_observers()
 
     @property
     def project_name(self):
@@ -53,14 +120,26 @@ class TestResult(object):
 
     @property
     def nb_finished_tests(self):
-        return len(self._get_tests(finished=True))
+        return self._nb_finished
 
     @property
     def nb_hits(self):
-        return len(self.hits)
+        return len(self._hits_url)
+
+    @property
+    def hits(self):
+        """Returns the hits as a list of Hit instances.
+
+        They are built on demand from the stored data, so prefer the
+        aggregation APIs when possible.
+        """
+        return [self._get_hit(index) for index in xrange(self.nb_hits)]
 
     @property
     def duration(self):
+        if self._duration is not None:
+            return self._duration
+
         end = self.stop_time or datetime.utcnow()
         if self.start_time is None:
             return 0
@@ -69,28 +148,30 @@ class TestResult(object):
 
     @property
     def nb_failures(self):
-        return sum([len(t.failures) for t in self._get_tests()])
+        return self._nb_failures
 
     @property
     def nb_errors(self):
-        return sum([len(t.errors) for t in self._get_tests()])
+        return self._nb_errors
 
     @property
     def nb_success(self):
-        return sum([t.success for t in self._get_tests()])
+        return self._nb_success
 
     @property
     def errors(self):
-        return itertools.chain((t.errors for t in (self._get_tests())))
+        return itertools.chain.from_iterable(t._errors or ()
+                                             for t in self._get_tests())
 
     @property
     def failures(self):
-        return itertools.chain((t.failures for t in (self._get_tests())))
+        return itertools.chain.from_iterable(t._failures or ()
+                                             for t in self._get_tests())
 
     @property
     def urls(self):
         """Returns the URLs that had been called."""
-        return set([h.url for h in self.hits])
+        return set(self._urls)
 
     @property
     def nb_tests(self):
@@ -103,6 +184,8 @@ class TestResult(object):
     def _get_hits(self, url=None, series=None):
         """Filters the hits with the given parameters.
 
+        Returns the indexes of the matching hits.
+
         :param url:
             The url you want to filter with. Only the hits targetting this URL
             will be returned.
@@ -110,16 +193,68 @@ class TestResult(object):
         :param series:
             Only the hits done during this series will be returned.
         """
-        def _filter(_hit):
-            if series is not None and _hit.series != series:
-                return False
-
-            if url is not None and _hit.url != url:
-                return False
+        if url is None and series is None:
+            return xrange(self.nb_hits)
+
+        by_url = by_series = None
+
+        if url is not None:
+            url_id = self._url_ids.get(url)
+            if url_id is None:
+                return array('l')
+            by_url = self._hits_by_url[url_id]
+
+        if series is not None:
+            by_series = self._hits_by_series.get(series)
+            if by_series is None:
+                return array('l')
+
+        if by_series is None:
+            return by_url
+        if by_url is None:
+            return by_series
+
+        # walk the smallest index and check the other column.
+        if len(by_url) <= len(by_series):
+            column, value, indexes = self._hits_series, series, by_url
+        else:
+            column, value, indexes = self._hits_url, url_id, by_series
 
-            return True
+        return array('l', (index for index in indexes
+                           if column[index] == value))
 
-        return filter(_filter, self.hits)
+    def _get_hits_column(self, name, url=None, series=None):
+        """Same as _get_hits, but returns the NumPy array of the values of
+        the given column for the matching hits.
+        """
+        if self._hits_arrays is None:
+            self._hits_arrays = dict(
+                (column, numpy.frombuffer(values, values.typecode).copy())
+                for column, values in (('status', self._hits_status),
+                                       ('elapsed', self._hits_elapsed)))
+
+        values = self._hits_arrays[name]
+
+        if url is None and series is None:
+            return values
+
+        indexes = self._get_hits(url, series)
+        return values[numpy.frombuffer(indexes, indexes.typecode)]
+
+    def _get_hit(self, index):
+        """Builds the Hit instance for the given index."""
+        loads_status = tuple(_or_none(column[index]) for column in
+                             (self._hits_series, self._hits_user,
+                              self._hits_current_hit,
+                              self._hits_current_user))
+
+        return Hit(url=self._urls[self._hits_url[index]],
+                   method=self._hits_method[index],
+                   status=self._hits_status[index],
+                   started=self._hits_started[index],
+                   elapsed=self._hits_elapsed[index],
+                   loads_status=loads_status,
+                   agent_id=self._hits_agent_id[index])
 
     def _get_tests(self, name=None, series=None, finished=None, user=None):
         """Filters the tests with the given parameters.
@@ -135,7 +270,22 @@ class TestResult(object):
 
         :param user:
             The user key to filter on.
+
+        The results are cached until a test is added or finished, so they
+        should not be modified.
         """
+        if name is None and series is None and finished is None:
+            return self.tests
+
+        state = len(self.tests), self._nb_finished
+        if state != self._tests_cache_state:
+            self._tests_cache = {}
+            self._tests_cache_state = state
+
+        key = name, series, finished
+        if key in self._tests_cache:
+            return self._tests_cache[key]
+
         def _filter(test):
             if name is not None and test.name != name:
                 return False
@@ -145,7 +295,8 @@ class TestResult(object):
                 return False
             return True
 
-        return filter(_filter, self.tests.values())
+        tests = self._tests_cache[key] = filter(_filter, self.tests)
+        return tests
 
     def average_request_time(self, url=None, series=None):
         """Computes the average time a request takes (in seconds)
@@ -157,8 +308,14 @@ class TestResult(object):
             You can filter by the series, to only know the average request time
             during a particular series.
         """
-        elapsed = [total_seconds(h.elapsed)
-                   for h in self._get_hits(url, series)]
+        if numpy is not None:
+            elapsed = self._get_hits_column('elapsed', url, series)
+            if len(elapsed):
+                return float(elapsed.mean())
+            return 0
+
+        all_elapsed = self._hits_elapsed
+        elapsed = [all_elapsed[index] for index in self._get_hits(url, series)]
 
         if elapsed:
             return float(sum(elapsed)) / len(elapsed)
@@ -166,8 +323,12 @@ class TestResult(object):
             return 0
 
     def get_request_time_quantiles(self, url=None, series=None):
-        elapsed = [total_seconds(h.elapsed)
-                   for h in self._get_hits(url=url, series=series)]
+        if numpy is not None:
+            elapsed = self._get_hits_column('elapsed', url, series).tolist()
+        else:
+            all_elapsed = self._hits_elapsed
+            elapsed = [all_elapsed[index]
+                       for index in self._get_hits(url=url, series=series)]
 
         # XXX Cache these results, they might be long to compute.
         return get_quantiles(elapsed, (0, 0.1, 0.5, 0.9, 1))
@@ -180,8 +341,16 @@ class TestResult(object):
         :param url: the url to filter on.
         :param hit: the hit to filter on.
         """
-        hits = list(self._get_hits(url, series))
-        success = [h for h in hits if 200 <= h.status < 400]
+        if numpy is not None:
+            statuses = self._get_hits_column('status', url, series)
+            if len(statuses):
+                success = (statuses >= 200) & (statuses < 400)
+                return float(success.mean())
+            return 0
+
+        statuses = self._hits_status
+        hits = self._get_hits(url, series)
+        success = [index for index in hits if 200 <= statuses[index] < 400]
 
         if hits:
             return float(len(success)) / len(hits)
@@ -212,9 +381,10 @@ class TestResult(object):
         return 1
 
     def requests_per_second(self, url=None, hit=None):
-        if self.duration == 0:
+        duration = self.duration
+        if duration == 0:
             return 0
-        return float(len(self.hits)) / self.duration
+        return float(self.nb_hits) / duration
 
     # batched results
     def batch(self, **args):
@@ -224,43 +394,83 @@ class TestResult(object):
 
     # These are to comply with the APIs of unittest.
     def startTestRun(self, agent_id=None, when=None):
-        if when is None:
-            when = datetime.utcnow()
-
         if agent_id is None:
-            self.start_time = when
+            self.start_time = when or datetime.utcnow()
+            self.stop_time = None
+            self._duration = None
+
+        self._notify('startTestRun', agent_id=agent_id, when=when)
 
     def stopTestRun(self, agent_id=None):
         # we don't want to start multiple time the test run
         if agent_id is None:
             self.stop_time = datetime.utcnow()
+            if self.start_time is not None:
+                self._duration = total_seconds(self.stop_time -
+                                               self.start_time)
+
+        self._notify('stopTestRun', agent_id=agent_id)
+        self.flush_observers()
 
     def startTest(self, test, loads_status, agent_id=None):
-        hit, user, current_hit, current_user = loads_status
         key = self._get_key(test, loads_status, agent_id)
-        if key not in self.tests:
-            self.tests[key] = Test(name=test, hit=hit, user=user)
+        test_id = self._test_ids.get(key)
+        if test_id is None:
+            hit, user = loads_status[:2]
+            self._test_ids[key] = len(self.tests)
+            t = Test(start=time.time(), name=test, hit=hit, user=user)
+            self.tests.append(t)
+        else:
+            t = self.tests[test_id]
+
+        self._notify('startTest', test, loads_status=loads_status,
+                     agent_id=agent_id, when=t._start)
 
     def stopTest(self, test, loads_status, agent_id=None):
-        hit, user, current_hit, current_user = loads_status
         t = self._get_test(test, loads_status, agent_id)
-        t.end = datetime.utcnow()
+        if not t.finished:
+            self._nb_finished += 1
+        t.end = time.time()
+
+        self._notify('stopTest', test, loads_status=loads_status,
+                     agent_id=agent_id, when=t._end)
 
     def addError(self, test, exc_info, loads_status, agent_id=None):
-        test = self._get_test(test, loads_status, agent_id)
-        test.errors.append(exc_info)
+        t = self._get_test(test, loads_status, agent_id)
+        if self.collect_tracebacks:
+            t.errors.append(exc_info)
+        else:
+            t.dropped_errors += 1
+        self._nb_errors += 1
+
+        self._notify('addError', test, exc_info=exc_info,
+                     loads_status=loads_status, agent_id=agent_id)
 
     def addFailure(self, test, exc_info, loads_status, agent_id=None):
-        test = self._get_test(test, loads_status, agent_id)
-        test.failures.append(exc_info)
+        t = self._get_test(test, loads_status, agent_id)
+        if self.collect_tracebacks:
+            t.failures.append(exc_info)
+        else:
+            t.dropped_failures += 1
+        self._nb_failures += 1
+
+        self._notify('addFailure', test, exc_info=exc_info,
+                     loads_status=loads_status, agent_id=agent_id)
 
     def addSuccess(self, test, loads_status, agent_id=None):
-        test = self._get_test(test, loads_status, agent_id)
-        test.success += 1
+        t = self._get_test(test, loads_status, agent_id)
+        t.success += 1
+        self._nb_success += 1
+
+        self._notify('addSuccess', test, loads_status=loads_status,
+                     agent_id=agent_id)
 
     def incr_counter(self, test, loads_status, name, agent_id=None):
-        test = self._get_test(test, loads_status, agent_id)
-        test.incr_counter(name)
+        t = self._get_test(test, loads_status, agent_id)
+        t.incr_counter(name)
+
+        self._notify('incr_counter', test, loads_status=loads_status,
+                     name=name, agent_id=agent_id)
 
     def get_counter(self, name, test=None):
         return sum([t.get_counter(name) for t in self._get_tests(name=test)])
@@ -272,33 +482,105 @@ class TestResult(object):
                 counters[name] += value
         return counters
 
-    def add_hit(self, **data):
-        self.hits.append(Hit(**data))
+    def add_hit(self, url, method, status, started, elapsed, loads_status,
+                agent_id=None):
+        url_id = self._url_ids.get(url)
+        if url_id is None:
+            url_id = self._url_ids[url] = len(self._urls)
+            self._urls.append(url)
+            self._hits_by_url.append(array('l'))
+
+        series, user, current_hit, current_user = (
+            loads_status or (None, None, None, None))
+
+        index = len(self._hits_url)
+        self._hits_by_url[url_id].append(index)
+        if series is not None:
+            by_series = self._hits_by_series.get(series)
+            if by_series is None:
+                by_series = self._hits_by_series[series] = array('l')
+            by_series.append(index)
+
+        self._hits_url.append(url_id)
+        self._hits_status.append(status)
+        if isinstance(elapsed, timedelta):
+            self._hits_elapsed.append(total_seconds(elapsed))
+        else:
+            self._hits_elapsed.append(elapsed)
+        self._hits_series.append(_or_sentinel(series))
+        self._hits_user.append(_or_sentinel(user))
+        self._hits_current_hit.append(_or_sentinel(current_hit))
+        self._hits_current_user.append(_or_sentinel(current_user))
+        self._hits_method.append(method)
+        self._hits_started.append(started)
+        self._hits_agent_id.append(agent_id)
+        self._hits_arrays = None
+
+        self._notify('add_hit', url=url, method=method, status=status,
+                     started=started, elapsed=elapsed,
+                     loads_status=loads_status, agent_id=agent_id)
 
     def socket_open(self, agent_id=None):
         self.opened_sockets += 1
 
+        self._notify('socket_open', agent_id=agent_id)
+
     def socket_close(self, agent_id=None):
         self.closed_sockets += 1
 
     def socket_message(self, size, agent_id=None):
         self.socket_data_received += size
 
-    def __getattribute__(self, name):
-        # call the observer's "push" method after calling the method of the
-        # test_result itself.
-        attr = object.__getattribute__(self, name)
-        if name in ('startTestRun', 'stopTestRun', 'startTest', 'stopTest',
-                    'addError', 'addFailure', 'addSuccess', 'add_hit',
-                    'socket_open', 'socket_message', 'incr_counter'):
-
-            def wrapper(*args, **kwargs):
-                ret = attr(*args, **kwargs)
-                for obs in self.observers:
-                    obs.push(name, *args, **kwargs)
-                return ret
-            return wrapper
-        return attr
+        self._notify('socket_message', size, agent_id=agent_id)
+
+    def _notify(self, event, *args, **kwargs):
+        """Queues the event for the observers once it had been processed by
+        the test_result itself.
+
+        The observers get the events later on, so the loads_status lists,
+        which the callers update in place, are copied. The time of the
+        event can be passed as a timestamp in "when", the observers get it
+        as a datetime.
+        """
+        if not self.observers:
+            return
+
+        loads_status = kwargs.get('loads_status')
+        if loads_status is not None:
+            kwargs['loads_status'] = tuple(loads_status)
+
+        when = kwargs.get('when')
+        if when is not None and not isinstance(when, datetime):
+            kwargs['when'] = _to_datetime(when)
+
+        buffer_ = self._obs_buffer
+        buffer_.append((event, args, kwargs))
+
+        if len(buffer_) >= self._obs_flush_size or gevent is None:
+            self.flush_observers()
+        elif self._obs_timer is None:
+            self._obs_timer = gevent.spawn_later(self._obs_flush_interval,
+                                                 self._flush_observers_later)
+
+    def _flush_observers_later(self):
+        self._obs_timer = None
+        self.flush_observers()
+
+    def flush_observers(self):
+        """Calls the observers' "push" method for every pending event."""
+        # cancel the pending timer, the events are being flushed now.
+        timer = self._obs_timer
+        if timer is not None:
+            self._obs_timer = None
+            timer.kill(block=False)
+
+        if not self._obs_buffer:
+            return
+
+        events, self._obs_buffer = self._obs_buffer, []
+        for obs in self.observers:
+            for name, args, kwargs in events:
+                obs.push(name, *args, **kwargs)
 
     def add_observer(self, observer):
         self.observers.append(observer)
@@ -308,98 +590,190 @@ class TestResult(object):
 
     def _get_test(self, test, loads_status, agent_id):
         key = self._get_key(test, loads_status, agent_id)
-        if key not in self.tests:
+        test_id = self._test_ids.get(key)
+        if test_id is None:
             self.startTest(test, loads_status, agent_id)
+            test_id = self._test_ids[key]
 
-        return self.tests[key]
+        return self.tests[test_id]
 
     def sync(self, run_id):
         pass
 
 
+# Stands for None in the integer columns of the hits.
+_NONE = -1
+
+
+def _or_sentinel(value):
+    return _NONE if value is None else value
+
+
+def _or_none(value):
+    return None if value == _NONE else value
+
+
+def _to_timestamp(value):
+    """Converts an UTC datetime to a timestamp, leaves anything else
+    untouched."""
+    if isinstance(value, datetime):
+        return timegm(value.utctimetuple()) + value.microsecond / 1e6
+    return value
+
+
+def _to_datetime(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.utcfromtimestamp(timestamp)
+
+
 class Hit(object):
     """Represent a hit.
 
     Used for later computation.
     """
+    __slots__ = ('url', 'method', 'status', 'started', 'elapsed', 'series',
+                 'user', 'current_hit', 'current_user', 'agent_id')
+
     def __init__(self, url, method, status, started, elapsed, loads_status,
                  agent_id=None):
         self.url = url
         self.method = method
         self.status = status
         self.started = started
-        if not isinstance(elapsed, timedelta):
+        if elapsed.__class__ is not timedelta:
             elapsed = timedelta(seconds=elapsed)
 
         self.elapsed = elapsed
 
-        loads_status = loads_status or (None, None, None, None)
-        (self.series, self.user, self.current_hit,
-         self.current_user) = loads_status
+        if loads_status is None:
+            self.series = self.user = None
+            self.current_hit = self.current_user = None
+        else:
+            (self.series, self.user, self.current_hit,
+             self.current_user) = loads_status
 
         self.agent_id = agent_id
 
 
 class Test(object):
-    """Represent a test that had been run."""
+    """Represent a test that had been run.
+
+    The start and end of the test are kept as timestamps, but can be read and
+    set as UTC datetimes. The start is left to None until the test is
+    actually started, see TestResult.startTest.
+
+    A result holds one Test per distinct loads_status, so they are kept
+    small: the failures and errors lists and the counters are only created
+    when they are first needed.
+    """
+    __slots__ = ('_start', '_end', 'name', 'hit', 'series', 'user',
+                 '_failures', '_errors', 'dropped_failures', 'dropped_errors',
+                 'success', '_counters')
 
     def __init__(self, start=None, **kwargs):
-        self.start = start or datetime.utcnow()
-        self.end = None
+        self._start = _to_timestamp(start)
+        self._end = None
         self.name = None
         self.hit = None
+        self.series = None
         self.user = None
 
-        self.failures = []
-        self.errors = []
+        self._failures = None
+        self._errors = None
+        # failures and errors counted without keeping their exc_info
+        self.dropped_failures = 0
+        self.dropped_errors = 0
         self.success = 0
-        self._counters = defaultdict(int)
+        self._counters = None
 
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+    @property
+    def failures(self):
+        if self._failures is None:
+            self._failures = []
+        return self._failures
+
+    @property
+    def errors(self):
+        if self._errors is None:
+            self._errors = []
+        return self._errors
+
     def incr_counter(self, name):
+        if self._counters is None:
+            self._counters = defaultdict(int)
         self._counters[name] += 1
 
+    @property
+    def start(self):
+        return _to_datetime(self._start)
+
+    @start.setter
+    def start(self, value):
+        self._start = _to_timestamp(value)
+
+    @property
+    def end(self):
+        return _to_datetime(self._end)
+
+    @end.setter
+    def end(self, value):
+        self._end = _to_timestamp(value)
+
     @property
     def finished(self):
-        return bool(self.end)
+        return self._end is not None
 
     @property
     def duration(self):
-        if self.end is not None:
-            return total_seconds(self.end - self.start)
+        if self._end is not None and self._start is not None:
+            return self._end - self._start
         else:
             return 0
 
+    @property
+    def nb_failures(self):
+        return len(self._failures or ()) + self.dropped_failures
+
+    @property
+    def nb_errors(self):
+        return len(self._errors or ()) + self.dropped_errors
+
     @property
     def success_rate(self):
-        total = self.success + len(self.failures) + len(self.errors)
+        total = self.success + self.nb_failures + self.nb_errors
         if total != 0:
             return float(self.success) / total
         return 1  # Every of the 0 runs we had was successful
 
     def __repr__(self):
         return ('<Test %s. errors: %s, failures: %s, success: %s>'
-                % (self.name, len(self.errors), len(self.failures),
+                % (self.name, self.nb_errors, self.nb_failures,
                    self.success))
 
     def get_error(self):
         """Returns the first encountered error"""
-        if not self.errors:
+        if not self._errors:
             return
 
-        return self.errors[0]
+        return self._errors[0]
 
     def get_failure(self):
         """Returns the first encountered failure"""
-        if not self.failures:
+        if not self._failures:
             return
 
-        return self.failures[0]
+        return self._failures[0]
 
     def get_counter(self, name):
+        if self._counters is None:
+            return 0
         return self._counters[name]
 
     def get_counters(self):
+        if self._counters is None:
+            return {}
         return self._counters
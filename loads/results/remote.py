@@ -52,8 +52,7 @@ class RemoteTestResult(TestResult):
         client = Client(self.args['broker'])
 
         for line in client.get_data(self.run_id, data_type=key):
-            line = line['exc_info']
-            yield [line]
+            yield line['exc_info']
 
     def sync(self, run_id):
         if self.args.get('agents') is None:
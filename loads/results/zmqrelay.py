@@ -10,9 +10,8 @@ except ImportError:
 
 try:
     import gevent
-    from gevent.queue import Queue
 except ImportError:
-    from Queue import Queue
+    gevent = None
 
 from loads.util import DateTimeJSONEncoder
 from loads.transport.util import get_hostname
@@ -118,35 +117,42 @@ class ZMQTestResult(object):
 
 
 class ZMQSummarizedTestResult(ZMQTestResult):
+    """Relays the method calls to a zmq endpoint in batches.
+
+    A batch is sent every `interval` seconds, or as soon as it holds
+    `max_size` messages.
+    """
     def __init__(self, args):
         super(ZMQSummarizedTestResult, self).__init__(args)
         self.interval = 1.
-        self._data = Queue()
+        self.max_size = 1000
+        self._counts = defaultdict(list)
+        self._size = 0
         gevent.spawn_later(self.interval, self._dump_data)
 
     def push(self, data_type, **data):
-        self._data.put_nowait((data_type, data))
+        self._counts[data_type].append(data)
+        self._size += 1
+        if self._size >= self.max_size:
+            self._send_batch()
 
     def close(self):
-        while not self._data.empty():
-            self._dump_data(loop=False)
+        self._send_batch()
         self.context.destroy()
 
-    def _dump_data(self, loop=True):
-        if self._data.empty() and loop:
-            gevent.spawn_later(self.interval, self._dump_data)
+    def _send_batch(self):
+        if self._size == 0:
             return
 
+        counts = self._counts
+        self._counts = defaultdict(list)
+        self._size = 0
+
         data = {'data_type': 'batch',
                 'agent_id': self.agent_id,
                 'hostname': get_hostname(),
                 'run_id': self.run_id,
-                'counts': defaultdict(list)}
-
-        # grabbing what we have
-        for _ in range(self._data.qsize()):
-            data_type, message = self._data.get()
-            data['counts'][data_type].append(message)
+                'counts': counts}
 
         while True:
             try:
@@ -157,5 +163,7 @@ class ZMQSummarizedTestResult(ZMQTestResult):
                     continue
                 else:
                     raise
-        if loop:
-            gevent.spawn_later(self.interval, self._dump_data)
+
+    def _dump_data(self):
+        self._send_batch()
+        gevent.spawn_later(self.interval, self._dump_data)
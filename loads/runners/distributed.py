@@ -1,11 +1,9 @@
-import json
-
 import zmq.green as zmq
 from zmq.green.eventloop import ioloop, zmqstream
 
 from loads.runners.local import LocalRunner
 from loads.transport.util import DEFAULT_PUBLISHER, DEFAULT_SSH_PUBLISHER
-from loads.util import logger, split_endpoint
+from loads.util import logger, split_endpoint, json
 from loads.results import TestResult, RemoteTestResult
 from loads.transport.client import Client
 
@@ -41,6 +39,10 @@ class DistributedRunner(LocalRunner):
         # io loop
         self.loop = ioloop.IOLoop()
 
+        # messages received since the last _process_results call
+        self._received = []
+        self.process_rate = 100
+
         self.zstream = zmqstream.ZMQStream(self.sub, self.loop)
         self.zstream.on_recv(self._recv_result)
 
@@ -71,9 +73,16 @@ class DistributedRunner(LocalRunner):
         return self._test_result
 
     def _recv_result(self, msg):
-        """When we receive some data from zeromq, send it to the test_result
-           for later use."""
-        self.loop.add_callback(self._process_result, msg)
+        """When we receive some data from zeromq, keep it until the next
+           _process_results call."""
+        self._received.append(msg)
+
+    def _process_results(self):
+        """Sends all the data received since the last call to the
+           test_result."""
+        received, self._received = self._received, []
+        for msg in received:
+            self._process_result(msg)
 
     def _process_result(self, msg):
         try:
@@ -151,6 +160,9 @@ class DistributedRunner(LocalRunner):
             cb = ioloop.PeriodicCallback(self.refresh, self.refresh_rate,
                                          self.loop)
             cb.start()
+            process_cb = ioloop.PeriodicCallback(self._process_results,
+                                                 self.process_rate, self.loop)
+            process_cb.start()
 
         try:
             self._attach_publisher()
@@ -169,6 +181,7 @@ class DistributedRunner(LocalRunner):
             if not detached:
                 # end..
                 cb.stop()
+                process_cb.stop()
                 self.test_result.stopTestRun()
                 self.context.destroy()
                 self.flush()
@@ -187,6 +200,9 @@ class DistributedRunner(LocalRunner):
         cb = ioloop.PeriodicCallback(self.refresh, self.refresh_rate,
                                      self.loop)
         cb.start()
+        process_cb = ioloop.PeriodicCallback(self._process_results,
+                                             self.process_rate, self.loop)
+        process_cb.start()
 
         self.run_id = run_id
         try:
@@ -194,6 +210,7 @@ class DistributedRunner(LocalRunner):
         finally:
             # end
             cb.stop()
+            process_cb.stop()
             self.test_result.stopTestRun()
             self.context.destroy()
             self.flush()
@@ -3,6 +3,7 @@ import subprocess
 import sys
 
 import gevent
+from gevent.pool import Pool
 
 from loads.util import (resolve_name, logger, pack_include_files,
                         unpack_include_files, set_logger)
@@ -12,6 +13,10 @@ from loads.output import create_output
 
 DEFAULT_LOGFILE = os.path.join('/tmp', 'loads-worker.log')
 
+# Number of tests a greenlet runs before yielding to the other ones, when
+# the tests themselves do not.
+YIELD_EVERY = 32
+
 
 def _compute_arguments(args):
     """
@@ -38,8 +43,8 @@ def _compute_arguments(args):
     # XXX duration based == no total
     total = 0
     if duration is None:
-        for user in users:
-            total += sum([hit * user for hit in hits])
+        # every user runs every hits series.
+        total = sum(users) * sum(hits)
         if agents is not None:
             total *= agents
 
@@ -189,15 +194,18 @@ class LocalRunner(object):
         if self.stop:
             return
 
+        sleep = gevent.sleep
+
         if self.duration is None:
             for hit in self.hits:
-                gevent.sleep(0)
+                sleep(0)
                 loads_status = list(self.args.get('loads_status',
                                                   (hit, user, 0, num)))
-                for current_hit in range(hit):
-                    loads_status[2] = current_hit + 1
+                for current_hit in xrange(1, hit + 1):
+                    loads_status[2] = current_hit
                     test(loads_status=list(loads_status))
-                    gevent.sleep(0)
+                    if not current_hit % YIELD_EVERY:
+                        sleep(0)
         else:
             def spawn_test():
                 loads_status = list(self.args.get('loads_status',
@@ -205,7 +213,8 @@ class LocalRunner(object):
                 while True:
                     loads_status[2] += 1
                     test(loads_status=loads_status)
-                    gevent.sleep(0)
+                    if not loads_status[2] % YIELD_EVERY:
+                        sleep(0)
 
             spawned_test = gevent.spawn(spawn_test)
             timer = gevent.Timeout(self.duration).start()
@@ -269,16 +278,26 @@ class LocalRunner(object):
             if not self.args.get('externally_managed'):
                 self.test_result.startTestRun(agent_id)
 
+            concurrency = self.args.get('concurrency')
+            if (concurrency is not None and self.duration is not None
+                    and concurrency < max(self.users)):
+                # each user keeps its slot for the whole duration
+                logger.warning('Only %d users run at the same time, the run '
+                               'will last longer than %s seconds.' %
+                               (concurrency, self.duration))
+
             for user in self.users:
                 if self.stop:
                     break
 
-                group = []
+                # spawning blocks while the pool is full. A None size means
+                # no limit.
+                pool = Pool(concurrency)
                 for i in range(user):
-                    group.append(gevent.spawn(self._run, i, user))
+                    pool.spawn(self._run, i, user)
                     gevent.sleep(0)
 
-                gevent.joinall(group)
+                pool.join()
 
             gevent.sleep(0)
 
@@ -294,6 +313,9 @@ class LocalRunner(object):
             # but do it only if we are in "normal" mode
             try:
                 if not self.slave:
+                    # the run may have stopped without a stopTestRun call,
+                    # send the pending events to the outputs first.
+                    self.test_result.flush_observers()
                     self.flush()
                 else:
                     # in slave mode, be sure to close the zmq relay.
@@ -42,6 +42,17 @@ class TestTestCase(unittest2.TestCase):
 
         self.assertRaises(ValueError, case.app.get, 'boh')
 
+    def test_loads_status_is_passed_on_each_run(self):
+        results = mock.Mock()
+        case = _MyTestCase('test_one', test_result=results)
+
+        case(loads_status=(1, 1, 1, 1))
+        case(loads_status=(1, 1, 2, 1))
+
+        statuses = [kw['loads_status'] for name, args, kw in
+                    results.method_calls if name == 'startTest']
+        self.assertEqual(statuses, [(1, 1, 1, 1), (1, 1, 2, 1)])
+
     def test_config_is_passed(self):
         test = _MyTestCase('test_one', test_result=mock.sentinel.results,
                            config={})
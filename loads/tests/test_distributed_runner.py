@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+import mock
+
+from loads.runners import DistributedRunner
+from loads.tests.support import get_runner_args
+from loads.util import json
+
+
+class TestDistributedRunner(TestCase):
+
+    def setUp(self):
+        args = get_runner_args(
+            fqn='loads.examples.test_blog.TestWebSite.test_something',
+            agents=2)
+        self.runner = DistributedRunner(args)
+        self.runner._test_result = mock.MagicMock()
+        self.runner.loop = mock.Mock()
+
+    def tearDown(self):
+        self.runner.context.destroy()
+
+    def _recv(self, **data):
+        self.runner._recv_result([json.dumps(data)])
+
+    def test_results_are_processed_together(self):
+        self._recv(data_type='add_hit', url='http://notmyidea.org')
+        self._recv(data_type='socket_open')
+        self.assertFalse(self.runner.test_result.add_hit.called)
+
+        self.runner._process_results()
+        self.runner.test_result.add_hit.assert_called_with(
+            url='http://notmyidea.org')
+        self.runner.test_result.socket_open.assert_called_with()
+        self.assertEqual(self.runner._received, [])
+
+    def test_loop_stops_when_all_agents_are_stopped(self):
+        self._recv(data_type='stopTestRun')
+        self.runner._process_results()
+        self.assertFalse(self.runner.loop.stop.called)
+
+        self._recv(data_type='batch', agent_id=1,
+                   counts={'stopTestRun': [{}]})
+        self.runner._process_results()
+        self.assertTrue(self.runner.loop.stop.called)
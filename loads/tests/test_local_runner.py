@@ -0,0 +1,79 @@
+from unittest2 import TestCase
+
+import gevent
+import mock
+
+from loads.case import TestCase as LoadsTestCase
+from loads.runners import LocalRunner
+from loads.tests.support import get_runner_args
+
+
+class _TestCase(LoadsTestCase):
+    running = max_running = calls = 0
+
+    def test_one(self):
+        pass
+
+    def test_concurrent(self):
+        cls = self.__class__
+        cls.calls += 1
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            gevent.sleep(.01)
+        finally:
+            cls.running -= 1
+
+
+class _Output(object):
+    """Records the events it gets, and the ones it had when flushed."""
+
+    def __init__(self):
+        self.events = []
+        self.flushed = None
+
+    def push(self, called_method, *args, **data):
+        self.events.append(called_method)
+
+    def flush(self):
+        self.flushed = list(self.events)
+
+
+class TestLocalRunner(TestCase):
+
+    def _get_runner(self, test='test_one', concurrency=None, **kw):
+        args = get_runner_args(
+            fqn='loads.tests.test_local_runner._TestCase.%s' % test,
+            output=['null'], **kw)
+        args['no_patching'] = True
+        args['concurrency'] = concurrency
+        runner = LocalRunner(args)
+        self.addCleanup(setattr, runner, 'stop', True)
+        return runner
+
+    def test_pending_events_are_flushed_to_the_outputs(self):
+        # without stopTestRun, nothing flushes the events on the way
+        runner = self._get_runner(externally_managed=True)
+        runner.test_result._obs_flush_interval = 60
+        output = _Output()
+        runner.outputs.append(output)
+        runner.test_result.add_observer(output)
+
+        runner._run_python_tests()
+        self.assertEqual(output.flushed,
+                         ['startTest', 'addSuccess', 'stopTest'])
+
+    def test_concurrency(self):
+        _TestCase.running = _TestCase.max_running = _TestCase.calls = 0
+        runner = self._get_runner('test_concurrent', users=5, hits=2,
+                                  concurrency=2)
+        runner._run_python_tests()
+
+        self.assertEqual(_TestCase.max_running, 2)
+        self.assertEqual(_TestCase.calls, 10)
+
+    def test_concurrency_with_duration_warns(self):
+        runner = self._get_runner(users=2, duration=.05, concurrency=1)
+        with mock.patch('loads.runners.local.logger') as logger:
+            runner._run_python_tests()
+        self.assertTrue(logger.warning.called)
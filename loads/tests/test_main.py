@@ -8,7 +8,7 @@ import re
 import mock
 from unittest2 import skipIf
 
-from loads.main import main, add_options
+from loads.main import main, add_options, _parse
 from loads.tests.test_functional import start_servers, stop_servers
 from loads.tests.support import hush
 from loads import __version__
@@ -144,3 +144,15 @@ class TestRunner(unittest2.TestCase):
         self.assertEquals(parser.add_argument.mock_calls[1],
                           mock.call('--test-classb-bar', default='bar',
                                     type=str, help='helptext'))
+
+
+class TestParse(unittest2.TestCase):
+
+    @hush
+    def test_concurrency_must_be_positive(self):
+        args, __ = _parse(['fqn', '--concurrency', '2'])
+        self.assertEqual(args.concurrency, 2)
+
+        for value in ('0', '-1', 'two'):
+            self.assertRaises(SystemExit, _parse,
+                              ['fqn', '--concurrency', value])
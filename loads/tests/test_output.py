@@ -12,6 +12,7 @@ from loads.output import (create_output, output_list, register_output,
                           StdOutput, NullOutput, FileOutput,
                           FunkloadOutput)
 from loads import output
+from loads.results import LoadsTestResult, TestResult
 
 from loads.tests.support import get_tb, hush
 
@@ -93,7 +94,7 @@ class TestStdOutput(TestCase):
 
     def test_tb_is_rendered(self):
         sys.stderr = StringIO.StringIO()
-        errors = iter([[get_tb(), ]])
+        errors = iter([get_tb()])
         std = StdOutput(mock.sentinel.test_result, mock.sentinel.args)
         std._print_tb(errors)
         sys.stderr.seek(0)
@@ -108,7 +109,7 @@ class TestStdOutput(TestCase):
     def test_classnames_strings_are_used_when_available(self):
         sys.stderr = StringIO.StringIO()
         std = StdOutput(mock.sentinel.test_result, mock.sentinel.args)
-        std._print_tb(iter([[['foo', 'foobar', None]]]))
+        std._print_tb(iter([['foo', 'foobar', None]]))
         sys.stderr.seek(0)
         out = sys.stderr.read()
         self.assertTrue('foo: foobar' in out)
@@ -172,6 +173,37 @@ class TestFileOutput(TestCase):
         finally:
             shutil.rmtree(tmpdir)
 
+    def test_test_result_events_are_written(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            test_result = TestResult()
+            output = FileOutput(test_result,
+                                {'output_file_filename': '%s/loads' % tmpdir})
+            test_result.add_observer(output)
+
+            # the adapter passes loads_status as a keyword
+            result = LoadsTestResult([1, 1, 1, 1], test_result)
+            result.startTest('bacon')
+            result.addError('bacon', get_tb())
+            result.addSuccess('bacon')
+            result.incr_counter('bacon', name='meh')
+            result.stopTest('bacon')
+            test_result.flush_observers()
+            output.flush()
+
+            with open('%s/loads' % tmpdir) as f:
+                content = f.read()
+
+            for event in ('startTest', 'addError', 'addSuccess',
+                          'incr_counter', 'stopTest'):
+                self.assertIn(event + ' - {', content)
+            self.assertEqual(content.count('"loads_status": [1, 1, 1, 1]'),
+                             5)
+            self.assertIn('"name": "meh"', content)
+            self.assertIn('"exc_info": [', content)
+        finally:
+            shutil.rmtree(tmpdir)
+
 
 class FakeTestCase(object):
     def __init__(self, name):
@@ -180,6 +212,30 @@ class FakeTestCase(object):
 
 class TestFunkloadOutput(TestCase):
 
+    def test_event_times_are_used(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            output = FunkloadOutput(
+                FakeTestResult(),
+                {'output_funkload_filename': '%s/funkload.xml' % tmpdir,
+                 'fqn': 'my_test_module.MyTestCase.test_mytest',
+                 'hits': 200, 'users': [1, 2, 5], 'duration': '1'})
+            output.push('startTestRun', when=TIME1)
+
+            test_case, state = FakeTestCase('test_mytest_foo'), (1, 2, 3, 4)
+            output.push('startTest', test_case, state, when=TIME1)
+            output.push('addSuccess', test_case, state)
+            output.push('stopTest', test_case, state,
+                        when=TIME1 + datetime.timedelta(seconds=2))
+            output.flush()
+
+            with open('%s/funkload.xml' % tmpdir) as f:
+                content = f.read()
+            self.assertIn('time="1368492668"', content)
+            self.assertIn('duration="2.0"', content)
+        finally:
+            shutil.rmtree(tmpdir)
+
     @patch('loads.output._funkload.format_tb', lambda x: x)
     def test_file_is_written(self):
 
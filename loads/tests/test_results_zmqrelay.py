@@ -3,7 +3,7 @@ import traceback
 from StringIO import StringIO
 import zmq.green as zmq
 
-from loads.results import ZMQTestResult
+from loads.results import ZMQTestResult, ZMQSummarizedTestResult
 from loads.tests.support import get_tb, hush
 from loads.util import json
 
@@ -139,3 +139,18 @@ class TestZmqRelay(TestCase):
         self.context.destroy()
         args = {'foo': 'bar', 'baz': 'foobar'}
         self.assertRaises(zmq.ZMQError, self.relay.add_hit, **args)
+
+    def test_batch_is_sent_when_full(self):
+        relay = ZMQSummarizedTestResult(args={'zmq_receiver': 'inproc://ok',
+                                              'zmq_context': self.context})
+        relay.max_size = 3
+        relay.add_hit(foo='bar')
+        relay.socket_message(12)
+        self.assertRaises(zmq.ZMQError, self._pull.recv, zmq.NOBLOCK)
+
+        relay.add_hit(foo='baz')
+        recv = json.loads(self._pull.recv())
+        self.assertEqual(recv['data_type'], 'batch')
+        self.assertEqual(recv['counts']['add_hit'],
+                         [{'foo': 'bar'}, {'foo': 'baz'}])
+        self.assertEqual(recv['counts']['socket_message'], [{'size': 12}])
@@ -1,6 +1,7 @@
 from unittest2 import TestCase
 from datetime import datetime, timedelta
 
+import mock
 from mock import Mock
 
 from loads.results.base import TestResult, Hit, Test
@@ -41,6 +42,26 @@ class TestTestResult(TestCase):
         self.assertEquals(test_result.nb_hits, 3)
         self.assertEquals(len(test_result.hits), 3)
 
+    def test_hits_are_rebuilt(self):
+        test_result = TestResult()
+        test_result.add_hit(**self._get_data(elapsed=_2, series=2))
+        data = self._get_data(url='http://another-one', status=404)
+        data['loads_status'] = None
+        test_result.add_hit(agent_id='agent', **data)
+
+        first, second = test_result.hits
+        self.assertEquals(first.url, 'http://notmyidea.org')
+        self.assertEquals(first.elapsed, _2)
+        self.assertEquals(first.series, 2)
+        self.assertEquals(first.current_user, 1)
+        self.assertEquals(first.agent_id, None)
+
+        self.assertEquals(second.url, 'http://another-one')
+        self.assertEquals(second.status, 404)
+        self.assertEquals(second.started, TIME1)
+        self.assertEquals(second.series, None)
+        self.assertEquals(second.agent_id, 'agent')
+
     def test_average_request_time_without_filter(self):
         test_result = TestResult()
         test_result.add_hit(**self._get_data(elapsed=_1))
@@ -85,6 +106,40 @@ class TestTestResult(TestCase):
         self.assertEquals(test_result.average_request_time(series=3),
                           2.6666666666666665)
 
+    def test_hits_statistics_without_numpy(self):
+        test_result = TestResult()
+        test_result.add_hit(**self._get_data(elapsed=_1))
+        test_result.add_hit(**self._get_data(elapsed=_3, status=500))
+        test_result.add_hit(**self._get_data(url='http://another-one',
+                                             elapsed=_2, series=2))
+
+        with mock.patch('loads.results.base.numpy', None):
+            self.assertEquals(test_result.average_request_time(), 2.0)
+            self.assertEquals(test_result.average_request_time(series=2),
+                              2.0)
+            self.assertEquals(
+                test_result.hits_success_rate('http://notmyidea.org'), 0.5)
+
+    def test_get_hits(self):
+        test_result = TestResult()
+        test_result.add_hit(**self._get_data())
+        test_result.add_hit(**self._get_data(url='http://another-one'))
+        test_result.add_hit(**self._get_data(series=2))
+        test_result.add_hit(**self._get_data(series=2))
+
+        self.assertEquals(list(test_result._get_hits()), [0, 1, 2, 3])
+        self.assertEquals(list(test_result._get_hits('http://notmyidea.org')),
+                          [0, 2, 3])
+        self.assertEquals(list(test_result._get_hits(series=2)), [2, 3])
+        self.assertEquals(list(test_result._get_hits('http://another-one',
+                                                     series=1)), [1])
+        self.assertEquals(list(test_result._get_hits('http://another-one',
+                                                     series=2)), [])
+        self.assertEquals(list(test_result._get_hits('http://unknown')), [])
+        self.assertEquals(list(test_result._get_hits(series=3)), [])
+        self.assertEquals(len(test_result._get_hits_column('elapsed',
+                                                           series=3)), 0)
+
     def test_average_request_time_when_no_data(self):
         test_result = TestResult()
         self.assertEquals(test_result.average_request_time(), 0)
@@ -120,8 +175,8 @@ class TestTestResult(TestCase):
         t.end = TIME2
 
         test_result = TestResult()
-        test_result.tests['toto', 1] = t
-        test_result.tests['tutu', 1] = t
+        test_result.tests.append(t)
+        test_result.tests.append(t)
 
         self.assertEquals(test_result.average_test_duration(), 120)
 
@@ -137,31 +192,43 @@ class TestTestResult(TestCase):
     def test_get_tests_filters_series(self):
         test_result = TestResult()
 
-        test_result.tests['bacon', 1] = Test(name='bacon', series=1)
-        test_result.tests['egg', 1] = Test(name='egg', series=1)
-        test_result.tests['spam', 2] = Test(name='spam', series=2)
+        test_result.tests.append(Test(name='bacon', series=1))
+        test_result.tests.append(Test(name='egg', series=1))
+        test_result.tests.append(Test(name='spam', series=2))
 
         self.assertEquals(len(test_result._get_tests(series=1)), 2)
 
     def test_get_tests_filters_names(self):
         test_result = TestResult()
 
-        test_result.tests['bacon', 1] = Test(name='bacon', series=1)
-        test_result.tests['bacon', 2] = Test(name='bacon', series=2)
-        test_result.tests['spam', 2] = Test(name='spam', series=2)
+        test_result.tests.append(Test(name='bacon', series=1))
+        test_result.tests.append(Test(name='bacon', series=2))
+        test_result.tests.append(Test(name='spam', series=2))
 
         self.assertEquals(len(test_result._get_tests(name='bacon')), 2)
 
     def test_get_tests_filters_by_both_fields(self):
         test_result = TestResult()
 
-        test_result.tests['bacon', 1] = Test(name='bacon', series=1)
-        test_result.tests['bacon', 2] = Test(name='bacon', series=2)
-        test_result.tests['spam', 2] = Test(name='spam', series=2)
+        test_result.tests.append(Test(name='bacon', series=1))
+        test_result.tests.append(Test(name='bacon', series=2))
+        test_result.tests.append(Test(name='spam', series=2))
 
         self.assertEquals(len(test_result._get_tests(name='bacon', series=2)),
                           1)
 
+    def test_get_tests_cache_is_invalidated(self):
+        test_result = TestResult()
+        test_result.startTest('bacon', (1, 1, 1, 1))
+        self.assertEquals(len(test_result._get_tests(name='bacon')), 1)
+        self.assertEquals(len(test_result._get_tests(finished=True)), 0)
+
+        test_result.startTest('bacon', (1, 1, 2, 1))
+        self.assertEquals(len(test_result._get_tests(name='bacon')), 2)
+
+        test_result.stopTest('bacon', (1, 1, 1, 1))
+        self.assertEquals(len(test_result._get_tests(finished=True)), 1)
+
     def test_test_success_rate_when_not_started(self):
         # it should be none if no tests had been collected yet.
         test_result = TestResult()
@@ -177,10 +244,170 @@ class TestTestResult(TestCase):
 
         self.assertEquals(0.5, test_result.test_success_rate())
 
+    def test_counters_are_updated_incrementally(self):
+        test_result = TestResult()
+
+        loads_status = (1, 1, 1, 1)
+        test_result.startTest('bacon', loads_status)
+        test_result.addSuccess('bacon', loads_status)
+        test_result.addSuccess('bacon', loads_status)
+        test_result.addFailure('bacon', 'A failure', loads_status)
+        test_result.addError('bacon', 'An error', loads_status)
+        self.assertEquals(test_result.nb_finished_tests, 0)
+
+        test_result.stopTest('bacon', loads_status)
+        test_result.stopTest('bacon', loads_status)
+
+        self.assertEquals(test_result.nb_success, 2)
+        self.assertEquals(test_result.nb_failures, 1)
+        self.assertEquals(test_result.nb_errors, 1)
+        self.assertEquals(test_result.nb_finished_tests, 1)
+
+    def test_errors_and_failures_are_flattened(self):
+        test_result = TestResult()
+        test_result.addError('bacon', 'error 1', (1, 1, 1, 1))
+        test_result.addError('bacon', 'error 2', (1, 1, 1, 1))
+        test_result.addError('bacon', 'error 3', (1, 1, 2, 1))
+        test_result.addFailure('egg', 'failure', (1, 1, 1, 1))
+
+        self.assertEquals(sorted(test_result.errors),
+                          ['error 1', 'error 2', 'error 3'])
+        self.assertEquals(list(test_result.failures), ['failure'])
+
+    def test_tracebacks_are_not_collected(self):
+        test_result = TestResult(args={'no_collect_tracebacks': True})
+        test_result.addSuccess('bacon', (1, 1, 1, 1))
+        test_result.addError('bacon', 'error', (1, 1, 1, 1))
+        test_result.addFailure('bacon', 'failure', (1, 1, 1, 1))
+
+        self.assertEquals(test_result.nb_errors, 1)
+        self.assertEquals(test_result.nb_failures, 1)
+        self.assertEquals(list(test_result.errors), [])
+        self.assertEquals(list(test_result.failures), [])
+
+        test = test_result.tests[0]
+        self.assertEquals(test.nb_errors, 1)
+        self.assertEquals(test.nb_failures, 1)
+        self.assertEquals(test.success_rate, 1. / 3)
+
+    def test_observers_are_notified(self):
+        test_result = TestResult()
+        observer = Mock()
+        test_result.add_observer(observer)
+
+        loads_status = (1, 1, 1, 1)
+        test_result.addSuccess('bacon', loads_status)
+        test_result.add_hit(**self._get_data())
+        test_result.flush_observers()
+
+        called = [call[0][0] for call in observer.push.call_args_list]
+        self.assertEquals(called, ['startTest', 'addSuccess', 'add_hit'])
+
+    def test_observers_get_the_state_of_each_event(self):
+        test_result = TestResult()
+        observer = Mock()
+        test_result.add_observer(observer)
+
+        # the same list is updated in place from one run to the other
+        loads_status = [0, 1, 0, 1]
+        for current_hit in (1, 2):
+            loads_status[2] = current_hit
+            test_result.startTest('bacon', loads_status)
+            test_result.addSuccess('bacon', loads_status)
+            test_result.stopTest('bacon', loads_status)
+        test_result.flush_observers()
+
+        statuses = [call[1]['loads_status']
+                    for call in observer.push.call_args_list]
+        self.assertEquals(statuses, [(0, 1, 1, 1)] * 3 + [(0, 1, 2, 1)] * 3)
+
+        # the times of the events are the ones of the tests
+        times = [(call[0][0], call[1]['when'])
+                 for call in observer.push.call_args_list
+                 if call[0][0] in ('startTest', 'stopTest')]
+        first, second = test_result.tests
+        self.assertEquals(times, [('startTest', first.start),
+                                  ('stopTest', first.end),
+                                  ('startTest', second.start),
+                                  ('stopTest', second.end)])
+
+    def test_events_are_not_prepared_without_observers(self):
+        test_result = TestResult()
+        with mock.patch('loads.results.base._to_datetime') as to_datetime:
+            test_result.startTest('bacon', [0, 1, 1, 1])
+            test_result.stopTest('bacon', [0, 1, 1, 1])
+        self.assertFalse(to_datetime.called)
+        self.assertEquals(test_result._obs_buffer, [])
+
+    def test_flush_timer_is_cancelled_when_flushing(self):
+        test_result = TestResult()
+        test_result._obs_flush_size = 2
+        test_result.add_observer(Mock())
+
+        test_result.add_hit(**self._get_data())
+        timer = test_result._obs_timer
+        self.assertFalse(timer is None)
+
+        # the buffer is full, the events are flushed right away
+        test_result.add_hit(**self._get_data())
+        self.assertTrue(test_result._obs_timer is None)
+        self.assertTrue(timer.dead)
+
+    def test_flush_timer_flushes_the_events(self):
+        test_result = TestResult()
+        observer = Mock()
+        test_result.add_observer(observer)
+
+        test_result.add_hit(**self._get_data())
+        test_result._obs_timer.join()
+        self.assertEquals(observer.push.call_count, 1)
+        self.assertTrue(test_result._obs_timer is None)
+
+    def test_observers_are_notified_by_batches(self):
+        test_result = TestResult()
+        test_result._obs_flush_size = 3
+        observer = Mock()
+        test_result.add_observer(observer)
+
+        test_result.add_hit(**self._get_data())
+        test_result.add_hit(**self._get_data())
+        self.assertEquals(observer.push.call_count, 0)
+
+        test_result.add_hit(**self._get_data())
+        self.assertEquals(observer.push.call_count, 3)
+
+        # stopping the run flushes the pending events
+        test_result.add_hit(**self._get_data())
+        test_result.stopTestRun()
+        self.assertEquals(observer.push.call_count, 5)
+
     def test_duration_is_zero_if_not_started(self):
         test_result = TestResult()
         self.assertEquals(test_result.duration, 0)
 
+    def test_duration_is_kept_once_stopped(self):
+        test_result = TestResult()
+        self.assertEquals(test_result.duration, 0)
+
+        test_result.startTestRun(when=TIME1)
+        self.assertTrue(test_result.duration > 0)
+
+        with mock.patch('loads.results.base.datetime') as dt:
+            dt.utcnow.return_value = TIME2
+            test_result.stopTestRun()
+        self.assertEquals(test_result.duration, 120)
+
+        # the duration is not computed again
+        test_result.stop_time = TIME2 + _1
+        self.assertEquals(test_result.duration, 120)
+
+        # starting a new run resets it
+        with mock.patch('loads.results.base.datetime') as dt:
+            dt.utcnow.return_value = TIME2 + _3
+            test_result.startTestRun(when=TIME2)
+            self.assertEquals(test_result.stop_time, None)
+            self.assertEquals(test_result.duration, 3)
+
     def test_requests_per_second_if_not_started(self):
         test_result = TestResult()
         self.assertEquals(test_result.requests_per_second(), 0)
@@ -272,6 +499,40 @@ class TestTest(TestCase):
         test.end = TIME2
         self.assertEquals(test.duration, 120)
 
+    def test_start_and_end_are_datetimes(self):
+        test = Test(TIME1)
+        self.assertEquals(test.start, TIME1)
+        self.assertEquals(test.end, None)
+        self.assertFalse(test.finished)
+
+        test.end = TIME2 + timedelta(microseconds=1500)
+        self.assertEquals(test.end, TIME2 + timedelta(microseconds=1500))
+        self.assertTrue(test.finished)
+
+    def test_start_is_set_when_the_test_starts(self):
+        test = Test()
+        test.end = TIME2
+        self.assertEquals(test.start, None)
+        self.assertEquals(test.duration, 0)
+
+        test_result = TestResult()
+        test_result.startTest('bacon', [1, 1, 1, 1])
+        self.assertTrue(isinstance(test_result.tests[0].start, datetime))
+
+    def test_errors_and_counters_are_created_when_needed(self):
+        test = Test()
+        self.assertEquals(test.get_error(), None)
+        self.assertEquals(test.get_counter('bacon'), 0)
+        self.assertEquals(test.get_counters(), {})
+        self.assertEquals(test._errors, None)
+        self.assertEquals(test._counters, None)
+
+        test.errors.append('error')
+        test.incr_counter('bacon')
+        self.assertEquals(test.errors, ['error'])
+        self.assertEquals(test.get_error(), 'error')
+        self.assertEquals(test.get_counter('bacon'), 1)
+
     def test_success_rate_when_none(self):
         test = Test()
         self.assertEquals(test.success_rate, 1)